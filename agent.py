@@ -1,171 +1,347 @@
+import hashlib
+import json
+import pathlib
+import re
 from argparse import Namespace
-from utils import fetch_whois_concurrently, load_model, scan_repos, fetch_github_readme
+from typing import Callable, Iterable, Iterator, Literal
+from pydantic import BaseModel
+from utils import (
+    build_affiliation_pattern,
+    chunk_items,
+    dedupe_repos,
+    iter_whois_concurrently,
+    load_checkpoint,
+    load_model,
+    normalize_domains,
+    run_concurrently,
+    save_checkpoint,
+    scan_repos,
+    truncate_text,
+    fetch_github_readme,
+)
 from config import Config, Secrets
+from cache import CachedAgent, SingleFlight, open_cache, verdict_key
 from smolagents import CodeAgent
+from prompts import (
+    ORG_SUMMARY_TMPL,
+    DUCK_DORKS_TMPL,
+    DOMAIN_DISCOVERY_TMPL,
+    DOMAIN_ASSESS_TMPL,
+    REPO_DISCOVERY_TMPL,
+    REPO_ASSESS_TMPL,
+)
 from tools import (
     GitHubSearchTool,
+    GitHubBatchSearchTool,
     VisitWebsiteTool,
+    VisitWebsitesTool,
     WhoIsTool,
+    WhoIsBatchTool,
     ExtractDomainsTool,
     BetterDuckDuckGoSearchTool,
+    TokenPool,
 )
 
 
+class Assessment(BaseModel):
+    """An agent's verdict on whether an item belongs to the target."""
+
+    confidence: Literal["yes", "maybe", "no"]
+    reason: str
+
+
 # TODO: This should use pydantic
 class Agent:
     """SmolAgent for LookerBot."""
 
+    __slots__ = (
+        "model",
+        "cheap_model",
+        "args",
+        "config",
+        "secrets",
+        "cache",
+        "inflight",
+        "github_tokens",
+        "tools",
+        "agent",
+    )
+
     def __init__(self, args: Namespace, config: Config, secrets: Secrets):
         # Assign attributes
         self.model = load_model(
             args.mode, config, secrets
         )  # Load the appropriate model based on the mode
+        self.cheap_model = load_model(
+            args.mode, config, secrets, cheap=True
+        )  # Used for the summary and first-pass assessments
         self.args = args
         self.config = config
         self.secrets = secrets
+        self.cache = open_cache(config.cache_dir)
+        self.inflight = SingleFlight()
+        self.github_tokens = TokenPool(secrets.github_tokens)  # Shared by every agent
+
+        # Tools hold sessions and memoized results, so every agent shares one set
+        self.tools = self._create_tools()
 
         # Create the agent with the created model
-        self.agent = CodeAgent(
-            tools=[
-                GitHubSearchTool(),
-                VisitWebsiteTool(),
-                BetterDuckDuckGoSearchTool(),
-                WhoIsTool(),
-                ExtractDomainsTool(),
-            ],
-            model=self.model,
+        self.agent = self._create_agent()
+
+    def _create_tools(self) -> list:
+        """
+        Creates LookerBot's tools
+        """
+        search_tool = GitHubSearchTool(self.github_tokens, cache=self.cache)
+        visit_tool = VisitWebsiteTool(cache=self.cache)
+        whois_tool = WhoIsTool(self.cache, self.config.cache_ttl)
+
+        return [
+            search_tool,
+            GitHubBatchSearchTool(search_tool),
+            visit_tool,
+            VisitWebsitesTool(visit_tool),
+            BetterDuckDuckGoSearchTool(),
+            whois_tool,
+            WhoIsBatchTool(whois_tool, self.config.whois_workers),
+            ExtractDomainsTool(),
+        ]
+
+    def _create_agent(self, model=None) -> CachedAgent:
+        """
+        Creates a cached CodeAgent with LookerBot's tools, using the main model by default
+        Agents keep memory between steps of a run, so concurrent runs each need their own
+        """
+        agent = CodeAgent(
+            tools=self.tools,
+            model=model or self.model,
             add_base_tools=True,
             additional_authorized_imports=["json"],
         )
 
+        return CachedAgent(
+            agent,
+            self.cache,
+            self.config.cache_ttl,
+            self.inflight,
+            self.args.refresh_cache,
+        )
+
+    def _run_prompts(self, prompts: Iterable[str], desc: str, model) -> list:
+        """
+        Runs independent prompts concurrently, each on a fresh agent
+        Returns the agent results in the same order as the prompts
+        """
+        return run_concurrently(
+            lambda prompt: self._create_agent(model).run(prompt),
+            prompts,
+            self.config.max_workers,
+            desc,
+        )
+
+    def _assess_batches(
+        self, items: Iterable[tuple], build_prompt: Callable, desc: str, model
+    ) -> dict:
+        """
+        Assesses (item, data) pairs in batches, one agent run per batch
+        Returns a dict of item -> the agent's assessment, None if it didn't provide a valid one
+        """
+        assessments = {}
+        batches = []
+
+        def uncached() -> Iterator[tuple]:
+            # Verdicts are cached per item, so they survive items being batched differently
+            for item, data in items:
+                key = self._verdict_key(model, item, data)
+                cached = None if self.args.refresh_cache else self.cache.get(key)
+                if cached is not None:
+                    assessments[item] = Assessment.model_validate(cached)
+                else:
+                    yield item, data
+
+        def prompts() -> Iterator[str]:
+            # Each batch is dispatched as soon as it fills, even while items are still arriving
+            for batch in chunk_items(uncached(), self.config.batch_size):
+                batches.append(batch)
+                yield build_prompt(batch)
+
+        results = self._run_prompts(prompts(), desc, model)
+
+        for batch, result in zip(batches, results):
+            # Agent output is normally already a dict, so only coerce it once when it isn't
+            if not isinstance(result, dict):
+                try:
+                    result = dict(result)
+                except (TypeError, ValueError):
+                    result = {}  # Every item in the batch becomes an error below
+
+            for item, data in batch.items():
+                try:
+                    assessment = Assessment.model_validate(result[item])
+                except (KeyError, TypeError, ValueError) as e:  # Incl. ValidationError
+                    print(f"Error: invalid assessment for {item}: {e}")
+                    assessments[item] = None
+                    continue
+
+                assessments[item] = assessment
+                self.cache.set(
+                    self._verdict_key(model, item, data),
+                    assessment.model_dump(),
+                    expire=self.config.cache_ttl,
+                )
+
+        return assessments
+
+    def _verdict_key(self, model, item: str, data) -> str:
+        """
+        Returns the cache key for a model's verdict on an item and its data
+        """
+        return verdict_key(model.model_id, self.args.target, item, data)
+
+    def _assess(
+        self, items: Iterable[tuple], build_prompt: Callable, desc: str
+    ) -> dict:
+        """
+        Assesses (item, data) pairs with the cheap model, escalating "maybe" verdicts to the main model
+        Returns a dict of item -> the agent's assessment, None if it didn't provide a valid one
+        """
+        collected = {}
+
+        def collect() -> Iterator[tuple]:
+            for item, data in items:
+                collected[item] = data
+                yield item, data
+
+        assessments = self._assess_batches(
+            collect(), build_prompt, desc, self.cheap_model
+        )
+
+        # Only worth a second opinion when a distinct cheap model is configured
+        if self.cheap_model.model_id != self.model.model_id:
+            unsure = {
+                item: collected[item]
+                for item, assessment in assessments.items()
+                if assessment and assessment.confidence == "maybe"
+            }
+            if unsure:
+                assessments.update(
+                    self._assess_batches(
+                        unsure.items(), build_prompt, f"{desc} (escalated)", self.model
+                    )
+                )
+
+        return assessments
+
     def run(self) -> dict:
         """
         Uses the agent to run various OSINT tasks, generating a dict report
         """
 
-        report = {}
+        # Resume from the sections an interrupted run already completed
+        checkpoint = self._checkpoint_path()
+        report = load_checkpoint(checkpoint)
+        if report:
+            print(f"Resuming from checkpoint {checkpoint}")
+
         report["info"] = {
             "target_organization": self.args.target,
             "mode": self.args.mode,
         }
-        report["organization_summary"] = self._organization_summary()
-        domains = self._domain_osint(report["organization_summary"])
-        report["domains"] = domains
-        report["github"] = self._github_osint(
-            list(domains.keys()), report["organization_summary"]
+        self._run_phase(report, "organization_summary", self._organization_summary)
+
+        # Render the summary once so every prompt shares an identical context block
+        context = json.dumps(report["organization_summary"], indent=4, default=str)
+
+        domains = self._run_phase(
+            report, "domains", lambda: self._domain_osint(context)
         )
-        report["duck_dorks"] = self._duck_dorks(
-            list(domains.keys()), report["organization_summary"]
+
+        # Combine the discovered domains with any provided on the command line
+        known_domains = list(domains.keys())
+        if self.args.domains:
+            known_domains += self.args.domains.split(",")
+
+        self._run_phase(
+            report, "github", lambda: self._github_osint(known_domains, context)
+        )
+        self._run_phase(
+            report, "duck_dorks", lambda: self._duck_dorks(known_domains, context)
         )
 
         return report
 
-    def _organization_summary(self) -> str:
+    def clear_checkpoint(self) -> None:
         """
-        Has the agent provide a summary of the target organization
+        Removes this run's checkpoint, once its report has been saved
         """
+        self._checkpoint_path().unlink(missing_ok=True)
 
-        organization_summary = self.agent.run(
-            f"""
-        **Role & Context**  
-        You are Looker, a highly skilled OSINT and cybersecurity expert employed by {self.args.target}. Your task is to search the internet and use your prior knowledge to gather key details about the target organization. Based on your findings, you will write a brief summary including the following information:
-
-        1. **What the organization does** - Provide a concise description of the organization's industry, products, or services.
-        2. **Headquarters location** - Where is the organization based (city, country)?
-        3. **Number of employees** - Provide an estimate of the organization's size in terms of employee count (ballpark figure).
-        4. **Primary domain** - Identify the primary domain or website of the organization.
-        5. **Subsidiaries** - Identify any subsidiaries, companies owned by the target organization.
-
-        **Instructions & Guidelines**
+    def _checkpoint_path(self) -> pathlib.Path:
+        """
+        Returns where this run's in-progress report is checkpointed
+        Keyed on every input that shapes the report, so changed inputs start fresh
+        """
+        name = re.sub(r"[^\w.-]+", "_", self.args.target)
+        inputs = (
+            f"{self.args.mode}\n{self.args.domains or ''}\n{self.args.keywords or ''}"
+        )
+        digest = hashlib.sha256(inputs.encode("utf-8")).hexdigest()[:12]
 
-        1. Search the internet for reliable, verifiable sources to extract this information. Use reputable websites such as the official company site, LinkedIn, or news articles, if necessary.
-        2. Use prior knowledge to fill in any gaps where real-time search results are unavailable, but avoid speculation.
-        3. Provide the summary in a human-readable format.
+        return pathlib.Path(self.config.checkpoint_dir) / f"{name}-{digest}.json"
 
-        The format for your answer should be:
+    def _run_phase(self, report: dict, key: str, func: Callable):
+        """
+        Runs a report phase unless a checkpoint already has it, then checkpoints the report
+        Returns the phase's section of the report
+        """
+        if key not in report:
+            report[key] = func()
+            save_checkpoint(report, self._checkpoint_path())
 
-        ```python
-        organization_summary = {{
-            "company_name": "{self.args.target}",
-            "what_they_do": "Verbose description of services or industry",
-            "headquarters": "City, Country",
-            "employee_count_estimate": "Approximately X employees",
-            "primary_domain": "www.example.com"
-            "subsidiaries": "Company 1, Company 2, etc."
-        }}
-        ```
+        return report[key]
 
-        Once you have gathered the necessary information, provide the final summary in the specified format. Do not invent details; only include verifiable facts from your search and prior knowledge.
+    def _organization_summary(self) -> str:
+        """
+        Has the agent provide a summary of the target organization
         """
+
+        # A summary rarely needs more than a search and a page visit, so use a scoped
+        # agent with just those tools and a low step ceiling
+        summary_agent = CodeAgent(
+            tools=[
+                tool
+                for tool in self.tools
+                if isinstance(tool, (BetterDuckDuckGoSearchTool, VisitWebsiteTool))
+            ],
+            model=self.cheap_model,
+            max_steps=3,
+            additional_authorized_imports=["json"],
         )
 
+        organization_summary = CachedAgent(
+            summary_agent,
+            self.cache,
+            self.config.cache_ttl,
+            self.inflight,
+            self.args.refresh_cache,
+        ).run(ORG_SUMMARY_TMPL.format_map({"target": self.args.target}))
+
         return organization_summary
 
-    def _duck_dorks(self, domains: list[str], context: dict) -> dict:
+    def _duck_dorks(self, domains: list[str], context: str) -> dict:
         """
         Performs deep DuckDuckGo dorking to uncover exposed services, login pages, and interesting directories
         related to the target organization or its domains.
         """
         dork_results = self.agent.run(
-            f"""
-            **Role & Context**
-            You are Looker, a cybersecurity OSINT agent performing reconnaissance on {self.args.target}. Your task is to use DuckDuckGo dorking techniques to discover potentially interesting or sensitive pages exposed online.
-
-            **Search Target**  
-            The target organization is: {self.args.target}  
-            You may use known domains associated with this org if available.
-
-            Here is some additional information on your target organization:
-            ```json
-            {context}
-            ```
-
-            The known domains for {self.args.target} are:
-            ```text
-            {domains}
-            ```
-
-            **Objectives**
-            Generate and run a thorough set of dorks to uncover:
-            - Login pages (e.g. admin, staff, client)
-            - Exposed admin panels
-            - Directory listings
-            - Git or SVN repositories
-            - Configuration or env files
-            - File indexes (e.g. PDFs, Docs, backups)
-            - Staging or test environments
-            - Open API portals or Swagger UIs
-
-            **Dork Examples You Might Use**
-            - site:<DOMAIN> intitle:"login"
-            - site:<DOMAIN> inurl:admin
-
-            **Instructions**
-            1. Generate and run as many diverse dork queries related to the target as you can concoct.
-            2. Parse and return links and page titles from the results.
-            3. Structure the output clearly, mapping each dork query to the results it found.
-
-            **Output Format**
-            ```json
-            {{
-                "dork query here": [
-                    {{
-                        "title": "Page title here",
-                        "url": "https://result-url.com"
-                    }},
-                    ...
-                ],
-                ...
-            }}
-            ```
-
-            Only return real results that appear in search. Skip queries with no results. Be concise and clean in output.
-            """
+            DUCK_DORKS_TMPL.format_map(
+                {"target": self.args.target, "context": context, "domains": domains}
+            )
         )
 
         return dork_results
 
-    def _domain_osint(self, context: dict) -> dict:
+    def _domain_osint(self, context: str) -> dict:
         """
         Has the agent perform OSINT to discover domain names potentially owned by the target
         Applies a reasoning pass to filter the results with confidence levels
@@ -173,157 +349,66 @@ class Agent:
 
         # Step 1: Collection - AI runs searches to find domains
         initial_domains = self.agent.run(
-            f"""
-        **Role & Context**  
-        You are Looker, a highly skilled OSINT and cybersecurity expert employed by {self.args.target}. Your task is to discover and aggregate all domain names that may be owned or affiliated with {self.args.target}. These will be gathered through public search results, and web scraping. Your goal is to produce a list of all domains belonging to an organization, being as detailed as possible with your search queries.
-
-        Here is some additional information on your target organization:
-        ```json
-        {context}
-        ```
-
-        **Task Description**  
-        Use a multi-stage approach to discover candidate domains related to {self.args.target}:
-
-        1. Use DuckDuckGo to find initial candidate websites and domains.  
-        2. Visit these sites to extract additional linked or mentioned domains.  
-        3. Return a final list of discovered domains
-
-        **Instructions & Guidelines**
-
-        **Discovery Methodology:**
-
-        - **Initial Domain Discovery via Search:**  
-        Run targeted queries via `BetterDuckDuckGoSearchTool` to discover websites related to {self.args.target}. Parse all result URLs and extract domain names.
-        You must be as thorough as possible with your search queries. Include more than just the provided examples to attempt to discover all possible domains. You should be as exhaustive as possible with your search queries.
-
-        - **Web Content Analysis:**  
-        Visit each domain and scan for additional domain mentions (in hyperlinks, text, and assets). Extract and collect all unique domains.
-
-        **Avoid Hallucination:**  
-
-        - Do not invent or infer ownership.  
-        - Only include domains discovered via search engine results or actual webpage content.  
-        - Always fetch real WHOIS data—no mocking or simulating.
-
-        **Output Format:**  
-        The final report should be a Python set of discovered domains
-
-        ```python
-        search_queries = [
-            "{self.args.target} official website",
-            "{self.args.target} domains",
-            "{self.args.target} contact page",
-            "{self.args.target} site",
-            "{self.args.target} blog",
-        ]
-
-        initial_domains = set()
-
-        # Step 1: DuckDuckGo search
-        for query in search_queries:
-            search_results = duckduckgo_search(query=query)
-            initial_domains.update(extract_domains(text=search_results))
-
-        # Step 2: Visit each domain and extract more
-        all_discovered_domains = set(initial_domains)
-        for domain in initial_domains:
-            try:
-                content = visit_website(url=f"http://{{domain}}")
-                more_domains = extract_domains(text=content)
-                all_discovered_domains.update(more_domains)
-            except:
-                continue
-
-        # Step 3: Return the final answer
-        final_answer(all_discovered_domains)
-        ```
-        """
+            DOMAIN_DISCOVERY_TMPL.format_map(
+                {"target": self.args.target, "context": context}
+            )
         )
 
-        # Lookup the WHOIS data for the domains it found and generate a report
-        domain_whois_report = fetch_whois_concurrently(initial_domains)
-
-        # Step 2: Reasoning Pass - AI evaluates and filters domains
+        # Lookup the WHOIS data for the unique domains it found and generate a report
+        domain_whois_report = {}
+
+        def whois_records() -> Iterator[tuple]:
+            for domain, whois_data in iter_whois_concurrently(
+                normalize_domains(initial_domains),
+                self.cache,
+                self.config.cache_ttl,
+                self.config.whois_workers,
+            ):
+                domain_whois_report[domain] = whois_data
+                yield domain, whois_data
+
+        # Step 2: Reasoning Pass - AI evaluates and filters domains in batches,
+        # starting on each batch as soon as its WHOIS records are in
         final_report = {}
 
-        for domain, whois_data in domain_whois_report.items():
-            confidence_assessment = self.agent.run(
-                f"""
-                **Role & Context**  
-                You are Looker, a cybersecurity OSINT agent. You have received a dictionary of domains and their WHOIS records that were discovered in relation to {self.args.target}. Your job is to assess each domain and determine whether it is likely affiliated with the target organization.
-
-                Here is some additional information on your target organization:
-                ```json
-                {context}
-                ```
-
-                **Instructions**
-
-                - For each domain, examine the WHOIS record and domain name.
-                - YOU MUST EXAMINE EVERY DOMAIN PROVIDED TO YOU.
-                - Based on registrant name, email, org name, prior knowledge, or other clues, determine if it appears to belong to {self.args.target}.
-                - Assign a confidence flag:  
-                - `"yes"` — clearly belongs to the target  
-                - `"maybe"` — unclear but possible  
-                - `"no"` — unrelated or belongs to someone else
-                - Err on the side of caution when assigning a confidence flag. Anything flagged as maybe will be manually verified by another analyst, don't flag something as yes unless you are completely confident it belongs to or is affiliated with {self.args.target}
-
-                **Avoid Hallucination**  
-                - Only rely on WHOIS data and other clues. Do not invent data.
-                - Use your web search and visit website tools to find more information about a domain if you're unsure of it's relation to {self.args.target}.
-                - Do not use general assumptions (e.g., “.org domains are always nonprofits”).  
-                - Use reasoning based on actual registrant data or domain naming.
-
-                **Final Output Format**
-
-                Return a Python dictionary with this structure:
-
-                ```python
-                result = {{
-                    "example.com": {{
-                        "confidence": "yes",
-                        "reason: "The WHOIS record for this domain references {self.args.target}",
-                        "whois": "<WHOIS RECORD>"
-                    }},
-                }}
-
-                final_answer(result)
-                ```
-
-                - You must ensure you've included the entire provided whois record in the final report.
-
-                Your input:
-                ```json
-                {{
-                    "{domain}": {whois_data}
-                }}
-                ```
-                """
-            )
+        assessments = self._assess(
+            whois_records(),
+            lambda batch: self._domain_assessment_prompt(batch, context),
+            "Assessing domains",
+        )
 
-            # Pull the result - include if it's a yes or maybe
-            try:
-                confidence_assessment = dict(confidence_assessment)
-                confidence = confidence_assessment[domain].get("confidence")
-                reason = confidence_assessment[domain].get("reason")
-                if confidence in ("yes", "maybe"):
-                    final_report[domain] = {
-                        "confidence": confidence,
-                        "reason": reason,
-                        "whois": whois_data,
-                    }
-            except Exception as e:
+        # Pull the results - include if it's a yes or maybe
+        for domain, whois_data in domain_whois_report.items():
+            assessment = assessments[domain]
+            if assessment is None:
                 final_report[domain] = {
                     "confidence": "ERROR - MANUALLY VERIFY",
                     "reason": "ERROR - MANUALLY VERIFY",
                     "whois": whois_data,
                 }
                 print(f"Error: Failed to determine confidence level for {domain}")
+            elif assessment.confidence in ("yes", "maybe"):
+                final_report[domain] = {
+                    "confidence": assessment.confidence,
+                    "reason": assessment.reason,
+                    "whois": whois_data,
+                }
 
         return final_report
 
-    def _github_osint(self, domains: list[str], context: dict) -> dict:
+    def _domain_assessment_prompt(self, batch: dict, context: str) -> str:
+        """
+        Builds the prompt used to assess a batch of domains and their WHOIS records
+        """
+        return DOMAIN_ASSESS_TMPL.format_map(
+            {
+                "target": self.args.target,
+                "context": context,
+                "batch": json.dumps(batch, indent=4, default=str),
+            }
+        )
+
+    def _github_osint(self, domains: list[str], context: str) -> dict:
         """
         Has the agent perform OSINT to discover GitHub repos
         Runs found repos through trufflehog
@@ -332,169 +417,70 @@ class Agent:
         additional_info = ""
 
         if self.args.keywords or domains:
-            context = ""
+            search_context = ""
             if domains:
-                context += (
+                search_context += (
                     f"- The known domains for {self.args.target} are {domains}.\n"
                 )
             if self.args.keywords:
-                context += f"- Some additional search keywords for {self.args.target} are {self.args.keywords}.\n"
+                search_context += f"- Some additional search keywords for {self.args.target} are {self.args.keywords}.\n"
 
             additional_info = f"""
             **Additional Context:**
-            {context}
+            {search_context}
             - You must search for each of these domains/keywords as you do your OSINT collection. Use each individual domain and keyword to search across all intelligence sources.
             """
 
         # Collect repositories owned by the org
         repos = self.agent.run(
-            f"""
-        **Role & Context**
-        You are Looker, a highly skilled OSINT and cybersecurity expert employed by {self.args.target}. Your duty is to audit the operational security of {self.args.target} by gathering comprehensive OSINT, especially by identifying all GitHub repositories that potentially belong to this organization. Your findings should contribute to preventing vulnerabilities that could lead to security breaches, thereby maximizing profit and ensuring operational security.
-
-        Here is some additional information on your target organization:
-        ```json
-        {context}
-        ```
-
-        **Task Description**
-        Your primary task is to search for GitHub repositories that are owned by or affiliated with {self.args.target}. Use GitHub dorks and custom search queries based on keywords that are tightly related to {self.args.target}—this should include the organization’s name, its key domain names, and any additional context provided (e.g., relevant product names, acronyms, or subsidiaries). Do not use generic or unrelated keywords (e.g., "healthcare") and do not generate or simulate fake results.
-
-        **Instructions & Guidelines**
-
-        **Keyword and Domain Identification:**
-
-        - If the target’s domain names are unknown, use appropriate tools to look them up and verify them before including them in your searches.
-        - Tailor all search queries specifically to {self.args.target} using verified keywords and domain names.
-        - If additional context (such as extra keywords or verified alternate domain names) is provided, incorporate those explicitly.
-
-        **Search Methodology:**
-
-        - Craft diverse search queries (dorks) to explore various angles (e.g., by repository name patterns, mentions in README files, or special configurations) that are likely to point to repositories owned by {self.args.target}.
-        - Ensure that each query is self-contained and clearly references {self.args.target} (e.g., “{self.args.target} AND <DOMAIN>”, "<DOMAIN>", "{self.args.target}").
-        - You must be as thorough as possible with your searches. You must uncover all repositories potentially belonging to {self.args.target} by performing as many targeted queries as you can come up with.
-
-        **Avoid Hallucination:**
-
-        - Do not generate example repository names or domain names if not confirmed. Only use verified data from tool lookups.
-        - Validate each keyword and domain used from trusted resources before including it in the search queries.
-
-        **Use of Tools:**
-
-        - Explicitly call your search tools (such as GitHub search APIs or custom dorking tools) and include a process to log or reference your methodology.
-        - Aggregate all found results into a final report. The final result format should be a unified list that includes the repository links and a brief comment on the relevance (if applicable).
-
-        **Output Structure:**
-
-        Aggregate the findings clearly in the following structure:
-
-        ```py
-        # Define an array of search queries, each tailored to {self.args.target} with verified keywords or domains.
-        queries = [
-            "{self.args.target} AND <verified_domain_or_keyword>",
-            "{self.args.target} AND <additional_verified_keyword>",
-            "{self.args.target}",
-            "<verified_domain_or_keyword>",
-            # Add more queries as needed
-        ]
-
-        results = []
-
-        # Loop through each query in the array and extend the results list with the findings.
-        for query in queries:
-            result = github_search(query=query, mode="repositories")
-            results.extend(result)
-
-        # Deduplicate the results.
-        unique_results = list(set(results))
-            
-        final_answer(unique_results)
-        ```
-
-        - Ensure that your final answer includes only verified and trustworthy information.
-        - The resulting format must be a list of urls as indicated in the example.
-
-        {additional_info}
+            REPO_DISCOVERY_TMPL.format_map(
+                {
+                    "target": self.args.target,
+                    "context": context,
+                    "additional_info": additional_info,
+                }
+            )
+        )
 
-        **Quality Assurance**
+        # Mirrors of the same repo (http vs https, ".git", trailing "/") would otherwise
+        # each cost a README fetch and an LLM assessment
+        repos = dedupe_repos(repos or [], self.config.max_repos)
 
-        - Before finalizing your output, double-check that all search queries are tailored uniquely to {self.args.target}.
-        - Make sure that no generic information is included in the final output.
-        - If any query results in ambiguous or unrelated data, document this and focus only on confirmed findings.
-            """
+        # Attempt to fetch the README file for each repo up front, concurrently
+        readme_results = run_concurrently(
+            lambda repo: fetch_github_readme(repo, self.cache, self.config.cache_ttl),
+            repos,
+            self.config.max_workers,
+            "Fetching READMEs",
+        )
+        readmes = dict(zip(repos, readme_results))
+
+        # Repos that never mention the target, its domains, or keywords are clearly
+        # unaffiliated, so skip them rather than paying for an LLM assessment
+        keywords = self.args.keywords.split(",") if self.args.keywords else []
+        affiliation = build_affiliation_pattern(self.args.target, domains, keywords)
+        candidates = {
+            repo: readme
+            for repo, readme in readmes.items()
+            if affiliation.search(f"{repo}\n{readme}")
+        }
+        print(
+            f"Skipping {len(readmes) - len(candidates)} repos with no reference to {self.args.target}"
         )
 
-        # Step 2: Reasoning Pass - AI evaluates and filters domains
+        # Step 2: Reasoning Pass - AI evaluates and filters repos in batches
         final_report = {}
 
-        for repo in repos:
-            # Attempt to fetch the README file
-            readme = fetch_github_readme(repo)
-
-            confidence_assessment = self.agent.run(
-                f"""
-                **Role & Context**  
-                You are Looker, a cybersecurity OSINT agent. You have received a list of GitHub repositories that were discovered in relation to {self.args.target}. Your job is to assess each reposiotory and determine whether it is likely affiliated with the target organization.
-
-                Here is some additional information on your target organization:
-                ```json
-                {context}
-                ```
-
-                **Instructions**
-
-                - For each domain, examine the GitHub repo and README file.
-                - YOU MUST EXAMINE EVERY repository PROVIDED TO YOU.
-                - Based on the repository, README file, or other clues, determine if it appears to belong to {self.args.target}.
-                - Assign a confidence flag:  
-                - `"yes"` — clearly belongs to the target  
-                - `"maybe"` — unclear but possible  
-                - `"no"` — unrelated or belongs to someone else
-                - Err on the side of caution when assigning a confidence flag. Anything flagged as maybe will be manually verified by another analyst, don't flag something as yes unless you are completely confident it belongs to or is affiliated with {self.args.target}
-
-                **Avoid Hallucination**  
-                - Only rely on real data and other clues. Do not invent data.
-                - Use your web search and visit website tools to find more information about a repository if you're unsure of it's relation to {self.args.target}.
-                - Do not use general assumptions
-
-                **Final Output Format**
-
-                Return a Python dictionary with this structure:
-
-                ```python
-                result = {{
-                    "repo URL": {{
-                        "confidence": "yes",
-                        "reason": "{self.args.target} is referenced in the README file"
-                    }},
-                }}
-
-                final_answer(result)
-                ```
-
-                Your input:
-
-                Repository URL: `{repo}`
-                
-                README File:
-
-                ```text
-                {readme}
-                ```
-                """
-            )
+        assessments = self._assess(
+            candidates.items(),
+            lambda batch: self._repo_assessment_prompt(batch, context),
+            "Assessing repos",
+        )
 
-            # Pull the result - include if it's a yes or maybe
-            try:
-                confidence_assessment = dict(confidence_assessment)
-                confidence = confidence_assessment[repo].get("confidence")
-                reason = confidence_assessment[repo].get("reason")
-                if confidence in ("yes", "maybe"):
-                    final_report[repo] = {
-                        "confidence": confidence,
-                        "reason": reason,
-                    }
-            except Exception as e:
+        # Pull the results - include if it's a yes or maybe
+        for repo in candidates:
+            assessment = assessments[repo]
+            if assessment is None:
                 final_report[repo] = {
                     "confidence": "ERROR - MANUALLY VERIFY",
                     "reason": "ERROR - MANUALLY VERIFY",
@@ -502,8 +488,40 @@ class Agent:
                 print(
                     f"Error: Failed to determine confidence level or reasoning for {repo}"
                 )
+            elif assessment.confidence in ("yes", "maybe"):
+                final_report[repo] = {
+                    "confidence": assessment.confidence,
+                    "reason": assessment.reason,
+                }
 
         # Run trufflehog on each one to find secrets
-        final_report = scan_repos(final_report, self.config.max_workers, self.config.os)
+        final_report = scan_repos(
+            final_report,
+            self.config.max_workers,
+            self.config.os,
+            self.config.clone_cache_dir,
+            self.cache,
+            self.config.cache_ttl,
+            self.config.verified_only,
+        )
 
         return final_report
+
+    def _repo_assessment_prompt(self, batch: dict, context: str) -> str:
+        """
+        Builds the prompt used to assess a batch of repositories and their README files
+        """
+        # Affiliation is usually clear from the top of a README, so cap each one
+        repo_inputs = "\n".join(
+            f"Repository URL: `{repo}`\n\nREADME File:\n\n"
+            f"```text\n{truncate_text(readme, self.config.readme_max_chars)}\n```\n"
+            for repo, readme in batch.items()
+        )
+
+        return REPO_ASSESS_TMPL.format_map(
+            {
+                "target": self.args.target,
+                "context": context,
+                "repo_inputs": repo_inputs,
+            }
+        )
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Callable
+from diskcache import Cache
+from smolagents import CodeAgent
+
+
+def open_cache(directory: str) -> Cache:
+    """
+    Opens (or creates) the on-disk cache shared by LookerBot
+    """
+    return Cache(directory)
+
+
+def verdict_key(model_id: str, target: str, item: str, data) -> str:
+    """
+    Builds the cache key for a single item's assessment
+    Data is serialized canonically so the same record always hashes the same
+    """
+    canonical = json.dumps(data, sort_keys=True, default=str)
+    payload = f"verdict\n{model_id}\n{target}\n{item}\n{canonical}"
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing a key so only the first caller does the work."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+
+    def do(self, key: str, func: Callable):
+        """
+        Calls func, or waits on the result of an identical call that's already running
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+            future.set_result(result)
+            return result
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+class CachedAgent:
+    """Wraps a CodeAgent, reusing results for prompts that have already been run."""
+
+    def __init__(
+        self,
+        agent: CodeAgent,
+        cache: Cache,
+        ttl: int,
+        inflight: SingleFlight,
+        refresh: bool = False,
+    ):
+        self.agent = agent
+        self.cache = cache
+        self.ttl = ttl
+        self.inflight = inflight
+        self.refresh = (
+            refresh  # Ignore cached results, rerunning and re-caching prompts
+        )
+
+    def _key(self, prompt: str) -> str:
+        """
+        Builds the cache key for a prompt, scoped to the model that answers it
+        """
+        model_id = getattr(self.agent.model, "model_id", "")
+        return hashlib.sha256(f"{model_id}\n{prompt}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _cacheable(result) -> bool:
+        """
+        Whether a result is worth replaying, every prompt asks for a list or dict answer
+        Strings are max-steps or "couldn't find" replies, and empty answers aren't worth keeping
+        """
+        return isinstance(result, (list, dict)) and len(result) > 0
+
+    def _cached(self, key: str):
+        """
+        Returns the cached result for a key, None on a miss or when refreshing
+        """
+        if self.refresh:
+            return None
+
+        result = self.cache.get(key)
+        return result if self._cacheable(result) else None
+
+    def _run_and_store(self, key: str, prompt: str):
+        """
+        Runs the agent and caches its result, if it's a usable answer
+        Checks the cache again first, in case a previous leader stored it after our miss
+        """
+        result = self._cached(key)
+        if result is not None:
+            return result
+
+        result = self.agent.run(prompt)
+        if self._cacheable(result):
+            self.cache.set(key, result, expire=self.ttl)
+
+        return result
+
+    def run(self, prompt: str):
+        """
+        Returns the cached result for a prompt, running the agent on a miss
+        Identical prompts that miss at the same time share a single agent run
+        """
+        key = self._key(prompt)
+
+        result = self._cached(key)
+        if result is not None:
+            return result
+
+        return self.inflight.do(key, lambda: self._run_and_store(key, prompt))
@@ -1,16 +1,18 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 import pathlib
+import functools
 import yaml
-import re
 import argparse
 from dotenv import load_dotenv
-import os
+from typing import Optional
 
 
 class HuggingFace(BaseModel):
     """HuggingFace API config class."""
 
     model_id: str
+    cheap_model_id: Optional[str] = None  # Used for summaries and first-pass triage
 
 
 class GenericModel(BaseModel):
@@ -18,6 +20,7 @@ class GenericModel(BaseModel):
 
     model_id: str
     api_base: str
+    cheap_model_id: Optional[str] = None  # Used for summaries and first-pass triage
 
 
 class Config(BaseModel):
@@ -27,23 +30,60 @@ class Config(BaseModel):
     lite_llm: GenericModel
     open_ai: GenericModel
     max_workers: int
+    batch_size: int = 15  # Items assessed per agent call
+    readme_max_chars: int = 4096  # README characters included per repo
+    max_repos: int = 200  # Repos carried past discovery into READMEs and assessment
+    cache_dir: str = ".looker_cache"
+    cache_ttl: int = 604800  # Seconds before cached agent results expire
+    checkpoint_dir: str = "checkpoints"  # Completed report sections of unfinished runs
+    clone_cache_dir: Optional[str] = None  # Mirror clones reused between scans, if set
+    verified_only: bool = False  # Only report secrets trufflehog could verify
+    whois_workers: int = 3  # Concurrent WHOIS lookups, registries rate limit past a few
     outfile: str  # TODO: Validate this
     os: str  # TODO: Validate this
 
 
-# TODO: This should use pydantic
-class Secrets:
+class Secrets(BaseSettings):
     """Secrets class to hold API Keys"""
 
-    github: str
-    huggingface: str
-    openai: str
+    model_config = SettingsConfigDict(
+        env_file=pathlib.Path(__file__).parent / ".env", extra="ignore", frozen=True
+    )
+
+    github: Optional[str] = Field(default=None, alias="GITHUB_API_KEY")
+    github_keys: Optional[str] = Field(default=None, alias="GITHUB_API_KEYS")
+    huggingface: Optional[str] = Field(default=None, alias="HF_API_KEY")
+    openai: Optional[str] = Field(default=None, alias="OPENAI_API_KEY")
+
+    @property
+    def github_tokens(self) -> list[str]:
+        """
+        Every configured GitHub token, from the comma seperated GITHUB_API_KEYS and GITHUB_API_KEY
+        """
+        tokens = (self.github_keys or "").split(",") + [self.github or ""]
+        return list(dict.fromkeys(token.strip() for token in tokens if token.strip()))
+
+
+@functools.lru_cache(maxsize=1)
+def get_secrets() -> Secrets:
+    """
+    Loads the API keys from the environment and .env file, once per process
+    .env is exported into the environment too, since LiteLLM reads provider keys from there
+    """
+    load_dotenv(pathlib.Path(__file__).parent / ".env")
+    return Secrets()
+
+
+# Use the libyaml C parser when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
-    def __init__(self):
-        load_dotenv()
-        self.github = os.getenv("GITHUB_API_KEY")
-        self.openai = os.getenv("OPENAI_API_KEY")
-        self.huggingface = os.getenv("HF_API_KEY")
+@functools.lru_cache(maxsize=8)
+def _load_yaml(path: str, mtime_ns: int) -> dict:
+    """
+    Parses a YAML file, cached on its path and modification time so edits are picked up
+    """
+    return yaml.load(pathlib.Path(path).read_text(), Loader=_YAML_LOADER)
 
 
 def load_config(path: str) -> dict:
@@ -52,10 +92,10 @@ def load_config(path: str) -> dict:
     Returns a dict of the loaded YAML content
     """
     cwd = pathlib.Path(__file__).parent
-    config_path = cwd / path
+    config_path = (cwd / path).resolve()
 
     try:
-        return yaml.safe_load(config_path.read_text())
+        return _load_yaml(str(config_path), config_path.stat().st_mtime_ns)
     except FileNotFoundError as error:
         message = "Error: yml config file not found."
         raise FileNotFoundError(error, message) from error
@@ -67,8 +107,6 @@ def _validate_arguments(args):
     Throws exceptions if not valid
     """
     modes = ["openai", "hf", "litellm"]
-    comma_seperated_domains_pattern = r"^[^\s,]+(,[^\s,]+)*$"
-    comma_seperated_keywords_pattern = r"^\s*[^,]+(\s*,\s*[^,]+)*\s*$"
 
     # Ensure the mode is a valid selection
     if args.mode.lower() not in modes:
@@ -76,18 +114,20 @@ def _validate_arguments(args):
             f"Error: {args.mode} is not a valid mode. Mode must be one of f{modes}."
         )
 
-    # Ensure domains are a comma seperated list
+    # Ensure domains are a comma seperated list, with no empty or whitespace entries
     if args.domains:
-        if not bool(re.fullmatch(comma_seperated_domains_pattern, args.domains)):
+        tokens = args.domains.split(",")
+        if any(not token or any(c.isspace() for c in token) for token in tokens):
             raise ValueError(
                 f"Error: {args.domains} is not a valid comma seperated string of domains."
             )
 
-    # Ensure keywords are a comma seperated list
+    # Ensure keywords are a comma seperated list, with no blank entries
     if args.keywords:
-        if not bool(re.fullmatch(comma_seperated_keywords_pattern, args.keywords)):
+        tokens = [token.strip() for token in args.keywords.split(",")]
+        if not all(tokens):
             raise ValueError(
-                f"Error: {args.domains} is not a valid comma seperated string of keywords."
+                f"Error: {args.keywords} is not a valid comma seperated string of keywords."
             )
 
 
@@ -112,6 +152,29 @@ def parse_arguments():
         help="The target organization to perform OSINT on.",
         type=str,
     )
+    parser.add_argument(
+        "-d",
+        "--domains",
+        dest="domains",
+        help="A comma seperated list of known domains belonging to the target.",
+        default=None,
+        type=str,
+    )
+    parser.add_argument(
+        "-k",
+        "--keywords",
+        dest="keywords",
+        help="A comma seperated list of additional search keywords for the target.",
+        default=None,
+        type=str,
+    )
+    parser.add_argument(
+        "-r",
+        "--refresh-cache",
+        dest="refresh_cache",
+        help="Ignore cached agent answers and verdicts, rerunning every prompt and re-caching the results.",
+        action="store_true",
+    )
     parser.add_argument(
         "-c",
         "--config",
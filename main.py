@@ -1,18 +1,23 @@
-from config import Config, Secrets, load_config, parse_arguments
-from agent import Agent
-from utils import save_report
+from config import Config, get_secrets, load_config, parse_arguments
 
 
 def main():
     # Setup
     args = parse_arguments()
     config = Config(**load_config(args.config))
-    secrets = Secrets()
+    secrets = get_secrets()
+
+    # Imported here so --help and argument/config errors don't pay for loading the agent stack
+    from agent import Agent
+    from utils import save_report
 
     # Run agent & save report
     looker = Agent(args, config, secrets)
     report = looker.run()
-    save_report(report, config.outfile)
+
+    # Keep the checkpoint if the report couldn't be written, so the run can be resumed
+    if save_report(report, config.outfile):
+        looker.clear_checkpoint()
 
 
 if __name__ == "__main__":
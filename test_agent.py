@@ -0,0 +1,25 @@
+from argparse import Namespace
+from unittest import mock
+
+from agent import Agent
+
+
+def _agent(**args) -> Agent:
+    agent = Agent.__new__(Agent)  # Skips loading models and opening the cache
+    agent.args = Namespace(
+        **{"target": "Acme Corp", "mode": "openai", "domains": None, "keywords": None}
+        | args
+    )
+    agent.config = mock.Mock(checkpoint_dir="checkpoints")
+    return agent
+
+
+def test_checkpoint_path_is_keyed_on_run_inputs():
+    path = _agent()._checkpoint_path()
+
+    assert path.parent.name == "checkpoints"
+    assert path.name.startswith("Acme_Corp-")
+    assert _agent()._checkpoint_path() == path
+    assert _agent(mode="hf")._checkpoint_path() != path
+    assert _agent(domains="acme.com")._checkpoint_path() != path
+    assert _agent(keywords="Road Runner")._checkpoint_path() != path
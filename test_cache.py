@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from cache import CachedAgent, SingleFlight, open_cache, verdict_key
+
+
+def _agent(*results) -> mock.Mock:
+    agent = mock.Mock()
+    agent.model.model_id = "model"
+    agent.run.side_effect = list(results)
+    return agent
+
+
+def test_verdict_key_is_canonical_and_scoped():
+    key = verdict_key("model", "Acme", "acme.com", {"b": 1, "a": [1, 2]})
+
+    assert key == verdict_key("model", "Acme", "acme.com", {"a": [1, 2], "b": 1})
+    assert key != verdict_key("other", "Acme", "acme.com", {"a": [1, 2], "b": 1})
+    assert key != verdict_key("model", "Acme", "acme.org", {"a": [1, 2], "b": 1})
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    barrier = threading.Barrier(4)
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)  # Long enough for the other callers to join this flight
+        return "result"
+
+    def call():
+        barrier.wait(5)
+        return flight.do("key", work)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(call) for _ in range(4)]
+
+    assert [future.result() for future in futures] == ["result"] * 4
+    assert len(calls) == 1
+
+
+def test_single_flight_shares_exceptions_and_forgets_the_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        flight.do("key", fail)
+    except ValueError:
+        pass
+
+    assert flight.do("key", lambda: "retried") == "retried"
+
+
+def test_cached_agent_replays_usable_answers(tmp_path):
+    cache = open_cache(str(tmp_path))
+    agent = _agent(["acme.com"])
+
+    first = CachedAgent(agent, cache, 60, SingleFlight()).run("prompt")
+    second = CachedAgent(agent, cache, 60, SingleFlight()).run("prompt")
+
+    assert first == second == ["acme.com"]
+    assert agent.run.call_count == 1
+
+
+def test_cached_agent_skips_strings_and_empty_answers(tmp_path):
+    cache = open_cache(str(tmp_path))
+    agent = _agent("Reached max steps.", [], {"acme.com": "yes"})
+    cached = CachedAgent(agent, cache, 60, SingleFlight())
+
+    assert cached.run("prompt") == "Reached max steps."
+    assert cached.run("prompt") == []
+    assert cached.run("prompt") == {"acme.com": "yes"}
+    assert cached.run("prompt") == {"acme.com": "yes"}
+    assert agent.run.call_count == 3
+
+
+def test_cached_agent_refresh_reruns_and_recaches(tmp_path):
+    cache = open_cache(str(tmp_path))
+    CachedAgent(_agent(["old"]), cache, 60, SingleFlight()).run("prompt")
+
+    refreshed = _agent(["new"])
+    assert CachedAgent(refreshed, cache, 60, SingleFlight(), True).run("prompt") == [
+        "new"
+    ]
+    assert CachedAgent(_agent(), cache, 60, SingleFlight()).run("prompt") == ["new"]
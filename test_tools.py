@@ -0,0 +1,65 @@
+from unittest import mock
+
+import requests
+
+from tools import GITHUB_SESSION, ExtractDomainsTool, GitHubSearchTool, TokenPool
+
+
+def _response(status: int, headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b'{"items": []}'
+    return response
+
+
+def test_github_session_leaves_429_to_token_pool():
+    retry = GITHUB_SESSION.get_adapter("https://api.github.com").max_retries
+    assert 429 not in retry.status_forcelist
+
+
+def test_request_rotates_token_on_429_with_retry_after():
+    tool = GitHubSearchTool(TokenPool(["first", "second"]))
+
+    with mock.patch.object(tool, "session") as session:
+        session.request.side_effect = [
+            _response(429, {"Retry-After": "60"}),
+            _response(200),
+        ]
+        response = tool.api_request("GET", "https://api.github.com/search/code?q=x", {})
+
+    assert response.status_code == 200
+    tokens = [
+        call.kwargs["headers"]["Authorization"]
+        for call in session.request.call_args_list
+    ]
+    assert tokens == ["Bearer first", "Bearer second"]
+
+
+def test_lookup_returns_a_copy_of_memoized_results():
+    tool = GitHubSearchTool(TokenPool(["token"]))
+    tool.store("github_search:repositories:x", ["https://github.com/a/b"])
+
+    tool.lookup("github_search:repositories:x").append("https://github.com/c/d")
+
+    assert tool.lookup("github_search:repositories:x") == ["https://github.com/a/b"]
+
+
+def test_extract_domains_handles_www_userinfo_ports_and_ipv6():
+    text = (
+        "See https://User@Foo.com:8080/x?y, www.Bar.org/path and (http://baz.io) "
+        '"HTTPS://[::1]:80/" http://a.b?q#f WWW.EX.COM'
+    )
+
+    assert ExtractDomainsTool().forward(text) == {
+        "foo.com",
+        "bar.org",
+        "baz.io",
+        "::1",
+        "a.b",
+        "ex.com",
+    }
+
+
+def test_extract_domains_skips_text_without_urls():
+    assert ExtractDomainsTool().forward("no links here, just example.com") == set()
@@ -0,0 +1,173 @@
+from unittest import mock
+
+import orjson
+
+from utils import (
+    build_affiliation_pattern,
+    canonicalize_repo_url,
+    canonicalize_url,
+    chunk_items,
+    dedupe_repos,
+    fetch_rdap,
+    load_checkpoint,
+    normalize_domains,
+    save_checkpoint,
+    truncate_text,
+)
+
+
+def test_normalize_domains_collapses_to_registered_domains():
+    domains = ["www.Example.com", "blog.example.com.", "shop.example.co.uk", "x.local"]
+    domains += ["10.0.0.1", None]
+
+    assert normalize_domains(domains) == {"example.com", "example.co.uk"}
+
+
+def test_canonicalize_url_ignores_case_query_order_and_fragment():
+    assert (
+        canonicalize_url(" HTTPS://Example.COM/a/?b=2&a=1#top ")
+        == "https://example.com/a?a=1&b=2"
+    )
+    assert canonicalize_url("https://example.com/") == "https://example.com"
+
+
+def test_canonicalize_repo_url_merges_mirrors():
+    urls = [
+        "http://GitHub.com/acme/tool.git",
+        "https://github.com/acme/tool/",
+        "github.com/acme/tool",
+    ]
+
+    assert {canonicalize_repo_url(url) for url in urls} == {
+        "https://github.com/acme/tool"
+    }
+
+
+def test_dedupe_repos_keeps_first_seen_order_and_limit():
+    repos = [
+        "https://github.com/acme/b",
+        "",
+        "https://github.com/acme/a.git",
+        "https://github.com/acme/b/",
+        "https://github.com/acme/c",
+    ]
+
+    assert dedupe_repos(repos, 2) == [
+        "https://github.com/acme/b",
+        "https://github.com/acme/a",
+    ]
+
+
+def test_truncate_text_keeps_start_and_end():
+    text = "abcdefghij" * 10
+
+    assert truncate_text(text, 200) == text
+    assert truncate_text(text, 8) == "abcdef\n...\nij"
+
+
+def test_truncate_text_with_no_room_for_a_tail():
+    assert truncate_text("abcdefghij" * 10, 0) == ""
+
+
+def test_chunk_items_batches_generators():
+    items = ((str(i), i) for i in range(5))
+
+    assert list(chunk_items(items, 2)) == [
+        {"0": 0, "1": 1},
+        {"2": 2, "3": 3},
+        {"4": 4},
+    ]
+
+
+def test_affiliation_pattern_matches_whole_words_only():
+    pattern = build_affiliation_pattern("HP", ["www.hp.com"], [])
+
+    assert not pattern.search("a php web framework")
+    assert not pattern.search("visit www.example.org")
+    assert pattern.search("Drivers for HP printers")
+    assert pattern.search("Docs live at https://support.hp.com/")
+
+
+def test_affiliation_pattern_uses_registered_domain_name():
+    pattern = build_affiliation_pattern(
+        "Acme Corp", ["shop.acme.co.uk"], ["Road Runner"]
+    )
+
+    assert pattern.search("built by acme")
+    assert pattern.search("the acme-corp toolkit")
+    assert pattern.search("road_runner helpers")
+    assert not pattern.search("a co.uk mirror")
+    assert not pattern.search("acmesoft")
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = tmp_path / "checkpoints" / "acme.json"
+    report = {"domains": {"acme.com": {"confidence": "yes"}}, "tags": {"a"}}
+
+    save_checkpoint(report, path)
+
+    assert load_checkpoint(path) == {
+        "domains": {"acme.com": {"confidence": "yes"}},
+        "tags": ["a"],
+    }
+
+
+def test_load_checkpoint_starts_fresh_when_missing_or_corrupt(tmp_path):
+    path = tmp_path / "acme.json"
+    assert load_checkpoint(path) == {}
+
+    path.write_text("{not json")
+    assert load_checkpoint(path) == {}
+
+
+def test_save_checkpoint_failure_does_not_raise(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+
+    save_checkpoint({"a": 1}, blocker / "acme.json")  # Parent is a file
+
+
+def test_fetch_rdap_maps_fields_to_whois_names():
+    body = {
+        "ldhName": "EXAMPLE.COM",
+        "nameservers": [{"ldhName": "A.IANA-SERVERS.NET"}, {}],
+        "status": ["active"],
+        "events": [
+            {"eventAction": "registration", "eventDate": "1995-08-14"},
+            {"eventAction": "expiration", "eventDate": "2030-08-13"},
+            {"eventAction": "transfer", "eventDate": "2001-01-01"},
+        ],
+        "entities": [
+            {
+                "roles": ["registrar"],
+                "vcardArray": ["vcard", [["fn", {}, "text", "Registrar Inc"]]],
+            },
+            {
+                "roles": ["registrant"],
+                "vcardArray": [
+                    "vcard",
+                    [
+                        ["version", {}, "text", "4.0"],
+                        ["org", {}, "text", "Example Org"],
+                        ["email", {}, "text", "admin@example.com"],
+                    ],
+                ],
+            },
+        ],
+    }
+    response = mock.Mock(content=orjson.dumps(body))
+
+    with mock.patch("utils.SESSION") as session:
+        session.get.return_value = response
+        record = fetch_rdap("example.com")
+
+    assert record == {
+        "domain_name": "example.com",
+        "name_servers": ["a.iana-servers.net"],
+        "status": ["active"],
+        "creation_date": "1995-08-14",
+        "expiration_date": "2030-08-13",
+        "registrar": "Registrar Inc",
+        "org": "Example Org",
+        "emails": "admin@example.com",
+    }
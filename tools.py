@@ -1,15 +1,41 @@
+import copy
+import itertools
 import random
+import threading
 import time
 import whois
+import tldextract
 import requests
+import orjson
 import re
-import markdownify
+from markdownify import markdownify
 from smolagents import Tool
-from urllib.parse import urlparse
-from config import Secrets
-from typing import Optional
-
-secrets = Secrets()
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlparse
+from config import get_secrets
+from diskcache import Cache
+from utils import (
+    HTTP_TIMEOUT,
+    SESSION,
+    canonicalize_url,
+    create_session,
+    get_whois_data,
+)
+from typing import Iterable, Iterator, Optional, Union
+
+# Matches URLs (http, https, or www-based), capturing just the authority (host, port, userinfo)
+_URL_AUTHORITY_RE = re.compile(
+    r'(?:https?://|(?=www\.))([^\s)"\'<>/?#]+)', re.IGNORECASE
+)
+
+# Runs of blank lines left behind by markdown conversion
+_MULTINEWLINE_RE = re.compile(r"\n{3,}")
+
+# Media types the visit tool will download, anything else is skipped up front
+# Only the HTML types go through markdownify, the rest are already readable as-is
+_HTML_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+_TEXT_TYPES = _HTML_TYPES | {"text/plain", "text/markdown", "application/json"}
 
 
 class VisitWebsiteTool(Tool):
@@ -22,17 +48,105 @@ class VisitWebsiteTool(Tool):
     }
     output_type = "string"
 
+    def __init__(
+        self,
+        max_bytes: int = 524288,
+        max_content_length: int = 2000000,
+        cache: Optional[Cache] = None,
+        ttl: int = 86400,
+    ):
+        super().__init__()
+        # Links and domain mentions are near the top of a page, so cap each download
+        self.max_bytes = max_bytes
+        self.max_content_length = max_content_length
+        self._pages: dict[str, str] = {}  # URL -> content, so revisits are free
+
+        # Pages persist on disk with their validators, so later runs can revalidate them
+        self.cache = cache
+        self.ttl = ttl
+
     def forward(self, url: str) -> str:
-        try:
-            # Send a GET request to the URL
-            response = requests.get(url)
-            response.raise_for_status()  # Raise an exception for bad status codes
+        url = url.strip()
+
+        # Query order, fragments, and host case don't change the page
+        page_key = canonicalize_url(url)
+        if page_key in self._pages:
+            return self._pages[page_key]
+
+        key = f"visit:{page_key}"
+        cached = self.cache.get(key) if self.cache is not None else None
 
-            # Convert the HTML content to Markdown
-            markdown_content = markdownify(response.text).strip()
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
 
-            # Remove multiple line breaks
-            markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
+        try:
+            # Stream the response so large pages are cut off instead of fully downloaded
+            with SESSION.get(
+                url, headers=headers, stream=True, timeout=HTTP_TIMEOUT
+            ) as response:
+                response.raise_for_status()  # Raise an exception for bad status codes
+
+                # Unchanged since our last visit, so no body was sent
+                if cached and response.status_code == 304:
+                    self._pages[page_key] = cached["markdown"]
+                    return cached["markdown"]
+
+                # Binaries, archives, and huge documents aren't worth downloading
+                content_type = response.headers.get("Content-Type", "")
+                # Plenty of small or self-hosted sites omit the header, treat those as HTML
+                media_type = (
+                    content_type.partition(";")[0].strip().lower() or "text/html"
+                )
+                length = response.headers.get("Content-Length", "")
+                size = int(length) if length.isdigit() else 0
+                if media_type not in _TEXT_TYPES:
+                    return (
+                        f"Skipped non-text content ({content_type or 'unknown type'})"
+                    )
+                if size > self.max_content_length:
+                    return f"Skipped oversized page ({content_type}, {size}B)"
+
+                body = bytearray()
+                for chunk in response.iter_content(65536):
+                    body += chunk
+                    if len(body) >= self.max_bytes:
+                        break
+
+                # Without a declared charset requests guesses ISO-8859-1, most pages are UTF-8
+                encoding = (
+                    response.encoding if "charset=" in content_type.lower() else None
+                )
+                text = bytes(body[: self.max_bytes]).decode(
+                    encoding or "utf-8", errors="ignore"
+                )
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+            if media_type in _HTML_TYPES:
+                # Convert the HTML content to Markdown
+                markdown_content = markdownify(text).strip()
+
+                # Remove multiple line breaks
+                markdown_content = _MULTINEWLINE_RE.sub("\n\n", markdown_content)
+            else:
+                # Raw files (e.g. raw.githubusercontent.com) are served as plain text
+                markdown_content = text.strip()
+
+            self._pages[page_key] = markdown_content
+            if self.cache is not None and (etag or last_modified):
+                self.cache.set(
+                    key,
+                    {
+                        "etag": etag,
+                        "last_modified": last_modified,
+                        "markdown": markdown_content,
+                    },
+                    expire=self.ttl,
+                )
 
             return markdown_content
 
@@ -42,6 +156,31 @@ class VisitWebsiteTool(Tool):
             return f"An unexpected error occurred: {str(e)}"
 
 
+class VisitWebsitesTool(Tool):
+    # Tool info
+    name = "visit_websites"
+    description = """
+    Visits several webpages concurrently and returns a dictionary mapping each URL to its content as a markdown string."""
+    inputs = {
+        "urls": {"type": "array", "description": "The URLs of the webpages to visit"}
+    }
+    output_type = "object"
+
+    def __init__(
+        self, visit_tool: Optional[VisitWebsiteTool] = None, max_workers: int = 8
+    ):
+        super().__init__()
+        # Sharing the single-page tool shares its memo of visited pages
+        self.visit_tool = visit_tool or VisitWebsiteTool()
+        self.max_workers = max_workers
+
+    def forward(self, urls: list) -> dict:
+        urls = list(dict.fromkeys(urls))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(urls, executor.map(self.visit_tool.forward, urls)))
+
+
 class WhoIsTool(Tool):
     # Tool Info
     name = "whois_lookup"
@@ -56,12 +195,69 @@ class WhoIsTool(Tool):
     }
     output_type = "string"
 
+    def __init__(self, cache: Optional[Cache] = None, ttl: int = 604800):
+        super().__init__()
+        self._records: dict = {}  # Domain -> WHOIS record, so repeat lookups are free
+
+        # Records persist on disk alongside the ones fetched for domain assessment
+        self.cache = cache
+        self.ttl = ttl
+
     # The inference code to be executed
     def forward(self, domain: str):
+        domain = domain.strip().lower()
+
+        # Subdomains share their registered domain's record, so look that up instead
+        domain = tldextract.extract(domain).registered_domain or domain
+
+        if domain in self._records:
+            return self._records[domain]
+
+        if self.cache is None:
+            record = whois.whois(domain)
+        else:
+            record = get_whois_data(domain, self.cache, self.ttl)[1]
+            if isinstance(record, str):  # Failed lookups aren't worth remembering
+                return record
+
+        self._records[domain] = record
+        return record
+
+
+class WhoIsBatchTool(Tool):
+    # Tool Info
+    name = "whois_lookup_batch"
+    description = """
+    This is a tool that queries the WHOIS data for several domains concurrently. It returns a dictionary mapping each domain to its fetched WHOIS data.
+    """
+    inputs = {
+        "domains": {
+            "type": "array",
+            "description": "The domain names to fetch WHOIS data on.",
+        },
+    }
+    output_type = "object"
 
-        domain_info = whois.whois(domain)
+    def __init__(self, whois_tool: Optional[WhoIsTool] = None, max_workers: int = 3):
+        super().__init__()
+        # Sharing the single-domain tool shares its memo of WHOIS records
+        self.whois_tool = whois_tool or WhoIsTool()
+        self.max_workers = (
+            max_workers  # Kept low, WHOIS servers rate limit aggressively
+        )
 
-        return domain_info
+    # The inference code to be executed
+    def forward(self, domains: list) -> dict:
+        domains = list(dict.fromkeys(domains))
+
+        def lookup(domain: str):
+            try:
+                return self.whois_tool.forward(domain)
+            except Exception as e:
+                return f"Error fetching WHOIS data: {str(e)}"
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(domains, executor.map(lookup, domains)))
 
 
 class ExtractDomainsTool(Tool):
@@ -78,26 +274,30 @@ class ExtractDomainsTool(Tool):
     }
     output_type = "array"
 
+    # Pulls the hostname out of a URL's authority, only paying for urlparse on unusual ones
+    def _hostname(self, authority: str) -> Optional[str]:
+        # Userinfo, ports, IPv6, and escapes need a real parser
+        if any(c in authority for c in "@:[%\\"):
+            return urlparse(f"http://{authority}").hostname
+
+        return authority.lower() or None
+
     # The inference code to be executed
     def forward(self, text: str) -> set:
-        # Regex to match URLs (http, https, or www-based)
-        url_pattern = re.compile(
-            r'https?://[^\s)"\'<>]+|www\.[^\s)"\'<>]+', re.IGNORECASE
-        )
+        # Most text has no URLs at all, so skip the regex scan when there can't be any
+        if "://" not in text and "www." not in text.lower():
+            return set()
 
-        # Find all URL-like strings
-        urls = re.findall(url_pattern, text)
+        # Find the authority of every URL-like string in a single scan
+        authorities = _URL_AUTHORITY_RE.findall(text)
 
         domains = set()
-        for url in urls:
+        for authority in authorities:
             try:
-                # Ensure URL has scheme for parsing
-                if not url.startswith("http"):
-                    url = "http://" + url
-                parsed_url = urlparse(url)
-                hostname = parsed_url.hostname
+                hostname = self._hostname(authority)
                 if hostname:
-                    domains.add(hostname.lower())
+                    # www.example.com and example.com are the same site to visit
+                    domains.add(hostname.lower().removeprefix("www."))
             except Exception:
                 continue  # Skip bad URLs
 
@@ -105,11 +305,92 @@ class ExtractDomainsTool(Tool):
 
 
 # TODO: consider grep.app?
+# Shared by every GitHubSearchTool so all agents draw on one connection pool. Kept
+# separate from the general session, so API keys are only ever sent to GitHub. 429s
+# aren't retried here, they're left for TokenPool to rotate tokens and back off
+GITHUB_SESSION = create_session(
+    headers={"Accept": "application/vnd.github+json"}, retry_statuses=(502, 503, 504)
+)
+
+
+class TokenPool:
+    """Hands out API tokens round-robin, shared by every tool that draws from it."""
+
+    def __init__(self, tokens: list[str], max_wait: float = 60.0):
+        self._lock = threading.Lock()
+        self._tokens = deque(tokens) or deque([None])  # None means unauthenticated
+        # Token -> when it's usable again, and how many times in a row it's been limited
+        self._resume_at: dict[Optional[str], float] = {}
+        self._strikes: dict[Optional[str], int] = {}
+        self.max_wait = max_wait
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    @property
+    def authenticated(self) -> bool:
+        return any(self._tokens)
+
+    def next(self) -> Optional[str]:
+        """
+        Returns the next token in the rotation that isn't rate limited
+        Waits for the soonest reset (up to max_wait) if every token is exhausted
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                for _ in range(len(self._tokens)):
+                    self._tokens.rotate(-1)
+                    token = self._tokens[-1]
+                    if self._resume_at.get(token, 0) <= now:
+                        return token
+
+                wait = min(self._resume_at.values()) - now
+
+            time.sleep(min(wait, self.max_wait))
+
+            # Waiting out max_wait is as long as we'll hold off, let a request try its luck
+            if wait > self.max_wait:
+                with self._lock:
+                    self._resume_at.clear()
+
+    def update(self, token: Optional[str], response: requests.Response) -> None:
+        """
+        Records a token's rate limit state from GitHub's response headers
+        """
+        headers = response.headers
+        resume_at = None
+
+        if (
+            headers.get("X-RateLimit-Remaining") == "0"
+            and headers.get("X-RateLimit-Reset", "").isdigit()
+        ):
+            resume_at = int(headers["X-RateLimit-Reset"])
+        if response.status_code in (403, 429):
+            retry_after = headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                resume_at = time.time() + int(retry_after)
+
+        with self._lock:
+            if response.status_code not in (403, 429):
+                self._strikes.pop(token, None)
+            elif resume_at is None:
+                # Secondary limit with no hint, back off exponentially
+                strikes = self._strikes.get(token, 0)
+                self._strikes[token] = strikes + 1
+                resume_at = time.time() + min(2**strikes, 30)
+
+            if resume_at is not None:
+                self._resume_at[token] = resume_at
+
+
 class GitHubSearchTool(Tool):
     # Tool Info
     name = "github_search"
     description = """
-    This is a tool that uses the GitHub API to submit a search. It returns the repositories which have results for the submitted query in a dictionary.
+    This is a tool that uses the GitHub API to submit a search. It returns a capped number of the top results for the submitted query.
+
+    In 'repositories' mode it returns a list of repository URLs. In 'code' mode it returns the repositories with matching code in a dictionary.
 
     Dictionary Format:
     {
@@ -129,41 +410,105 @@ class GitHubSearchTool(Tool):
             "description": "The mode to search in, must be one of ['code','repositories']",
         },
     }
-    output_type = "string"
+    output_type = "object"
 
-    # Queries GitHub w/API Key
-    def query_github(self, query: str, mode: str) -> requests.Response:
-        url = f"https://api.github.com/search/{mode}"
-
-        headers = {
-            "Authorization": f"Bearer {secrets.github}",
-        }
+    def __init__(
+        self,
+        tokens: Optional[TokenPool] = None,
+        max_pages: int = 3,
+        max_results: int = 200,
+        cache: Optional[Cache] = None,
+        ttl: int = 3600,
+        page_ttl: int = 86400,
+    ):
+        super().__init__()
+        self.max_pages = max_pages
+        self.max_results = max_results  # Keeps broad searches from flooding the agent
+        self.tokens = tokens or TokenPool(get_secrets().github_tokens)
+
+        # Parsed results per (mode, query), kept briefly since search results drift.
+        # Raw pages are kept longer with their ETags, so once the results expire the
+        # pages can be revalidated instead of downloaded again
+        self.cache = cache
+        self.ttl = ttl
+        self.page_ttl = page_ttl
+
+        self.session = GITHUB_SESSION
+
+        # Search key -> parsed results, so repeated searches are free
+        self._results: dict[str, Union[list, dict]] = {}
+
+    # Sends a GitHub API request, rotating tokens and backing off when rate limited
+    def api_request(
+        self, method: str, url: str, headers: dict, **kwargs
+    ) -> requests.Response:
+        attempts = len(self.tokens) + 2
+
+        for attempt in range(attempts):
+            # Waits here when every token is rate limited, rather than burning a request
+            token = self.tokens.next()
+            auth = {"Authorization": f"Bearer {token}"} if token else {}
+
+            response = self.session.request(
+                method, url, headers={**headers, **auth}, timeout=HTTP_TIMEOUT, **kwargs
+            )
+            self.tokens.update(token, response)
 
-        params = {"q": query, "per_page": 100}
+            if response.status_code not in (403, 429) or attempt + 1 == attempts:
+                break
 
-        response = requests.get(url, headers=headers, params=params)
         response.raise_for_status()
 
         return response
 
-    # Parses results
-    def parse_response(self, response: requests.Response, mode: str) -> dict:
-        results = response.json()
-        output = None
+    # Queries GitHub w/API Key, yielding each page of results
+    def query_github(self, query: str, mode: str) -> Iterator[dict]:
+        url = f"https://api.github.com/search/{mode}?" + urlencode(
+            {"q": query, "per_page": 100}
+        )
 
-        if mode.lower() == "repositories":
-            output = []
-            for item in results["items"]:
-                output.append(item["html_url"])
-        else:
-            output = {}
-            for item in results["items"]:
-                output[item["repository"]["full_name"]] = {
-                    "path": item["path"],
-                    "url": item["html_url"],
+        for _ in range(self.max_pages):
+            # A 304 for a page we've already seen doesn't count against the rate limit
+            key = f"github_page:{url}"
+            cached = self.cache.get(key) if self.cache is not None else None
+            headers = {"If-None-Match": cached["etag"]} if cached else {}
+
+            response = self.api_request("GET", url, headers)
+
+            if cached and response.status_code == 304:
+                page = cached
+            else:
+                page = {
+                    "etag": response.headers.get("ETag"),
+                    "body": orjson.loads(response.content),
+                    "next": response.links.get("next", {}).get("url"),
                 }
+                if self.cache is not None and page["etag"]:
+                    self.cache.set(key, page, expire=self.page_ttl)
+
+            yield page["body"]
 
-        return output
+            url = page["next"]
+            if not url:
+                break
+
+    # Parses results, aggregating the items across pages
+    def parse_response(self, pages: Iterable[dict], mode: str) -> Union[list, dict]:
+        # Pages are fetched lazily, so stopping at max_results skips the pages after it
+        items = itertools.islice(
+            (item for page in pages for item in page["items"]), self.max_results
+        )
+
+        if mode.lower() == "repositories":
+            return [item["html_url"] for item in items]
+
+        return {
+            item["repository"]["full_name"]: {
+                "path": item["path"],
+                "url": item["html_url"],
+            }
+            for item in items
+        }
 
     # The inference code to be executed
     def forward(self, query: str, mode: str):
@@ -175,14 +520,145 @@ class GitHubSearchTool(Tool):
                 f"Error: mode '{mode}' is not a valid mode. Must be one of {modes}"
             )
 
+        query = query.strip()
+        key = f"github_search:{mode.lower()}:{query}"
+        results = self.lookup(key)
+        if results is not None:
+            return results
+
         try:
-            response = self.query_github(query, mode)
-            results = self.parse_response(response, mode)
+            pages = self.query_github(query, mode)
+            results = self.parse_response(pages, mode)
         except requests.RequestException as e:
             return f"Error fetching the webpage: {str(e)}"
 
+        self.store(key, results)
+
         return results
 
+    # Returns memoized or disk cached results for a search key, None on a miss
+    # Callers get their own copy, so one agent editing its results can't change another's
+    def lookup(self, key: str) -> Optional[Union[list, dict]]:
+        results = self._results.get(key)
+        if results is None and self.cache is not None:
+            results = self.cache.get(key)
+            if results is not None:
+                self._results[key] = results
+
+        return copy.deepcopy(results)
+
+    # Remembers a search's results for this run, and on disk if there's a cache
+    def store(self, key: str, results: Union[list, dict]) -> None:
+        self._results[key] = copy.deepcopy(results)
+        if self.cache is not None:
+            self.cache.set(key, results, expire=self.ttl)
+
+
+class GitHubBatchSearchTool(Tool):
+    # Tool Info
+    name = "github_search_batch"
+    description = """
+    This is a tool that runs several GitHub repository searches at once, using as few API requests as possible. It returns a dictionary mapping each query to a list of repository URLs.
+
+    Use this instead of calling github_search in 'repositories' mode once per query. Code searches are not supported.
+    """
+    inputs = {
+        "queries": {
+            "type": "array",
+            "description": "The repository search queries to submit to github (e.g. ['example.com', 'org:example'])",
+        },
+    }
+    output_type = "object"
+
+    def __init__(
+        self,
+        search_tool: Optional[GitHubSearchTool] = None,
+        batch_size: int = 10,
+        max_results: int = 100,
+    ):
+        super().__init__()
+        # Sharing the single-query tool shares its tokens, session, and cached results
+        self.search_tool = search_tool or GitHubSearchTool()
+        self.batch_size = batch_size  # Searches aliased into each GraphQL request
+        self.max_results = min(max_results, 100)  # GraphQL caps a search at 100 nodes
+
+    # Builds the cache key for a batched search, scoped to the result cap
+    def _key(self, query: str) -> str:
+        return f"github_search_batch:{self.max_results}:{query}"
+
+    # Runs a batch of repository searches as aliased fields of one GraphQL query
+    def query_graphql(self, queries: list[str]) -> dict[str, list]:
+        fields = " ".join(
+            f"q{i}: search(query: $q{i}, type: REPOSITORY, first: {self.max_results}) "
+            "{ nodes { ... on Repository { url } } }"
+            for i in range(len(queries))
+        )
+        variables = ", ".join(f"$q{i}: String!" for i in range(len(queries)))
+        payload = {
+            "query": f"query({variables}) {{ {fields} }}",
+            "variables": {f"q{i}": query for i, query in enumerate(queries)},
+        }
+
+        response = self.search_tool.api_request(
+            "POST", "https://api.github.com/graphql", {}, json=payload
+        )
+        data = orjson.loads(response.content).get("data") or {}
+
+        # A search that errored comes back null, leave it for the caller to retry
+        return {
+            query: [node["url"] for node in data[f"q{i}"]["nodes"] if node]
+            for i, query in enumerate(queries)
+            if data.get(f"q{i}")
+        }
+
+    # The inference code to be executed
+    def forward(self, queries: list) -> dict:
+        queries = list(dict.fromkeys(query.strip() for query in queries))
+        results = {}
+
+        # Batch results are capped lower than REST ones, so they're cached under their own
+        # key. A cached REST search is a superset, so it's reused trimmed to the cap
+        pending = []
+        for query in queries:
+            cached = self.search_tool.lookup(self._key(query))
+            if cached is None:
+                cached = self.search_tool.lookup(f"github_search:repositories:{query}")
+            if cached is not None:
+                results[query] = cached[: self.max_results]
+            else:
+                pending.append(query)
+
+        # GraphQL won't take unauthenticated requests, so those go through REST
+        fallback = []
+        if not self.search_tool.tokens.authenticated:
+            pending, fallback = fallback, pending
+
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start : start + self.batch_size]
+            try:
+                found = self.query_graphql(batch)
+            except requests.RequestException:
+                found = {}
+
+            for query in batch:
+                if query in found:
+                    results[query] = found[query]
+                    self.search_tool.store(self._key(query), found[query])
+                else:
+                    fallback.append(query)
+
+        for query in fallback:
+            result = self.search_tool.forward(query, "repositories")
+
+            # Errors come back as a message, which the agent would extend into its URLs
+            if isinstance(result, str):
+                print(f"Error searching GitHub for {query!r}: {result}")
+                result = []
+            results[query] = result
+
+        # Keep the caller's query order
+        return {query: results[query] for query in queries}
+
 
 class BetterDuckDuckGoSearchTool(Tool):
     name = "duckduckgo_search"
@@ -191,6 +667,12 @@ class BetterDuckDuckGoSearchTool(Tool):
         "query": {"type": "string", "description": "The search query to perform."}
     }
     output_type = "string"
+    user_agents = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.2 Safari/605.1.15",
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15A372 Safari/604.1",
+    )
 
     def __init__(
         self,
@@ -216,26 +698,32 @@ class BetterDuckDuckGoSearchTool(Tool):
         self.DDGS = DDGS
         self.kwargs = kwargs
 
+        # One long-lived client per user agent, so searches reuse its connections
+        self._lock = threading.Lock()
+        self._clients: dict[str, tuple] = {}  # User agent -> (client, lock)
+
     def _delay(self):
         time.sleep(random.uniform(self.min_delay, self.max_delay))
 
     def _rotate_user_agent(self) -> str:
-        user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.2 Safari/605.1.15",
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15A372 Safari/604.1",
-        ]
-        return random.choice(user_agents)
+        return random.choice(self.user_agents)
+
+    def _client(self, user_agent: str) -> tuple:
+        with self._lock:
+            if user_agent not in self._clients:
+                self._clients[user_agent] = (
+                    self.DDGS(headers={"User-Agent": user_agent}, **self.kwargs),
+                    threading.Lock(),  # Clients aren't shared between threads mid-search
+                )
+            return self._clients[user_agent]
 
     def forward(self, query: str) -> str:
         last_exception: Optional[Exception] = None
         for attempt in range(self.retries):
             try:
                 self._delay()
-                with self.DDGS(
-                    headers={"User-Agent": self._rotate_user_agent()}, **self.kwargs
-                ) as ddgs:
+                ddgs, lock = self._client(self._rotate_user_agent())
+                with lock:
                     results = ddgs.text(query, max_results=self.max_results)
                 if not results:
                     raise Exception(
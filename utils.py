@@ -1,50 +1,133 @@
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from smolagents import OpenAIServerModel, HfApiModel, LiteLLMModel
 import whois
-from config import Config, Secrets
-from typing import Union
+import tldextract
+from config import Config, GenericModel, HuggingFace, Secrets
+from diskcache import Cache
+from typing import Callable, Iterable, Iterator, Optional, Union
 import subprocess
-import json
-from datetime import datetime
+import tempfile
+import os
+import shutil
+import pathlib
+import orjson
+import itertools
+import functools
+import hashlib
+import re
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# (connect, read) timeout in seconds for every outbound request, so one slow host can't stall a worker
+HTTP_TIMEOUT = (3, 10)
+
+
+def create_session(
+    pool_maxsize: int = 16,
+    headers: Optional[dict] = None,
+    retry_statuses: Iterable[int] = (429, 502, 503, 504),
+) -> requests.Session:
+    """
+    Creates a requests session with a pooled adapter that retries transient failures
+    Callers that handle rate limits themselves can leave 429 out of retry_statuses
+    Returns the configured session
+    """
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+
+    adapter = HTTPAdapter(
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=3, backoff_factor=0.5, status_forcelist=list(retry_statuses)
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+# Shared HTTP session so repeated requests to the same host reuse connections
+SESSION = create_session()
+
+# Suffixes reserved for local or special use, none of which have a WHOIS registry
+NON_WHOIS_SUFFIXES = frozenset(
+    {
+        "arpa",
+        "example",
+        "home",
+        "internal",
+        "invalid",
+        "lan",
+        "local",
+        "localhost",
+        "onion",
+        "test",
+    }
+)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_model(model_class: type, **kwargs):
+    """
+    Constructs a smolagents model, reusing the instance for identical settings
+    """
+    return model_class(**kwargs)
+
+
+def _select_model_id(settings: Union[HuggingFace, GenericModel], cheap: bool) -> str:
+    """
+    Picks the cheap model for a provider if requested and configured, the main model otherwise
+    """
+    if cheap and settings.cheap_model_id:
+        return settings.cheap_model_id
+
+    return settings.model_id
+
+
+# Mode -> builder taking (config, secrets, cheap), so loading a model is a single lookup
+_MODEL_BUILDERS: dict[str, Callable] = {
+    "hf": lambda config, secrets, cheap: _build_model(
+        HfApiModel,
+        model_id=_select_model_id(config.hugging_face, cheap),
+        token=secrets.huggingface,
+    ),
+    "openai": lambda config, secrets, cheap: _build_model(
+        OpenAIServerModel,
+        model_id=_select_model_id(config.open_ai, cheap),
+        api_base=config.open_ai.api_base,
+        api_key=secrets.openai,
+    ),
+    "litellm": lambda config, secrets, cheap: _build_model(
+        LiteLLMModel,
+        model_id=_select_model_id(config.lite_llm, cheap),
+        api_base=config.lite_llm.api_base,
+    ),
+}
 
 
 def load_model(
-    mode: str, config: Config, secrets: Secrets
+    mode: str, config: Config, secrets: Secrets, cheap: bool = False
 ) -> Union[OpenAIServerModel, HfApiModel, LiteLLMModel]:
     """
     Returns a well-formed smolagents model based on a provided mode string
+    Pass cheap=True for the provider's cheaper model, if one is configured
     """
-    mode = mode.lower()
-
-    match mode:
-        case "hf":
-            model = HfApiModel(
-                model_id=config.hugging_face.model_id, token=secrets.huggingface
-            )
-        case "openai":
-            model = OpenAIServerModel(
-                model_id=config.open_ai.model_id,
-                api_base=config.open_ai.api_base,
-                api_key=secrets.openai,
-            )
-        case "litellm":
-            model = LiteLLMModel(
-                model_id=config.lite_llm.model_id,
-                api_base=config.lite_llm.api_base,
-            )
-        case _:
-            raise ValueError(f"Error: {mode} is not a valid mode.")
+    try:
+        builder = _MODEL_BUILDERS[mode.lower()]
+    except KeyError:
+        raise ValueError(f"Error: {mode.lower()} is not a valid mode.") from None
 
-    return model
+    return builder(config, secrets, cheap)
 
 
-def scan_repo_with_trufflehog(url: str, os: str) -> list[str]:
+def find_trufflehog(os: str) -> Optional[str]:
     """
-    Uses TruffleHog to scan a GitHub repository and pull JSON output
-    Takes a URL string of the repo to scan, returns a list of findings in JSON format
-    Relies on trufflehog being installed
+    Resolves the path to the trufflehog binary for the OS, checking PATH then the LookerBot folder
+    Returns None if trufflehog isn't installed
     """
     # Use the correct command based on the OS
     if os.lower() == "windows" or os.lower() == "win":
@@ -52,100 +135,393 @@ def scan_repo_with_trufflehog(url: str, os: str) -> list[str]:
     else:
         command = "trufflehog"
 
-    # Run the command and capture the output
-    result = subprocess.run(
-        [
-            command,
-            "--json",
-            "--results=verified,unknown",
-            "--no-update",
-            "git",
-            url,
-        ],
-        capture_output=True,
-        text=True,
-        encoding="utf-8",
+    return shutil.which(command) or shutil.which(
+        command, path=str(pathlib.Path(__file__).parent)
     )
 
-    if result.returncode != 0:
-        print("Error running TruffleHog:", result.stderr)
-        return []
 
-    # Parse each line of JSON output
+def trufflehog_concurrency(scans: int) -> int:
+    """
+    Splits the CPUs between trufflehog processes running at the same time,
+    so parallel scans don't each spin up a worker per core
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, scans))
+
+
+def scan_repo_with_trufflehog(
+    url: str,
+    command: str,
+    concurrency: Optional[int] = None,
+    verified_only: bool = False,
+) -> Optional[list[dict]]:
+    """
+    Uses TruffleHog to scan a GitHub repository and pull JSON output
+    Takes a URL string of the repo to scan and the trufflehog binary to use, and optionally
+    the detector concurrency and whether to skip unverified results.
+    Returns a list of findings in JSON format, None if the scan failed
+    """
     findings = []
 
-    for line in result.stdout.strip().split("\n"):
-        if line:
-            try:
-                findings.append(json.loads(line))
-            except json.JSONDecodeError as e:
-                print("Failed to parse line:", line)
+    # Stream the output so findings are parsed while the scan runs, rather than buffering
+    # it all. Stderr goes to a temp file, since an unread pipe could fill up and block
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as stderr:
+        with subprocess.Popen(
+            [
+                command,
+                "--json",
+                "--results=verified" if verified_only else "--results=verified,unknown",
+                "--no-update",
+                *([f"--concurrency={concurrency}"] if concurrency else []),
+                "git",
+                url,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            text=True,
+            encoding="utf-8",
+        ) as process:
+            # Parse each line of JSON output
+            for line in process.stdout:
+                line = line.strip()
+                if line:
+                    try:
+                        findings.append(orjson.loads(line))
+                    except orjson.JSONDecodeError as e:
+                        print("Failed to parse line:", line)
+
+        if process.returncode != 0:
+            stderr.seek(0)
+            print("Error running TruffleHog:", stderr.read())
+            return None
 
     return findings
 
 
-def scan_repos(repos: dict, max_workers: int, os: str) -> dict:
+def _git_env() -> dict:
+    """
+    Returns the environment for git subprocesses, with credential prompts turned off
+    so a private or deleted repo fails instead of blocking a worker forever
+    """
+    return {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+
+
+def remote_refs_digest(url: str) -> Optional[str]:
+    """
+    Fingerprints every branch and tag of a remote repo with git ls-remote
+    Returns None if the remote couldn't be listed
+    """
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", url],
+            check=True,
+            capture_output=True,
+            timeout=60,
+            env=_git_env(),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    return hashlib.sha256(result.stdout).hexdigest()
+
+
+def mirror_repo(url: str, directory: str, timeout: int = 900) -> str:
+    """
+    Clones a bare mirror of a repo into the clone cache, or updates the mirror already there
+    Raises TimeoutExpired if git takes longer than timeout seconds
+    Returns a file:// URL for trufflehog to scan
+    """
+    slug = re.sub(r"[^\w.-]+", "_", url.partition("://")[2] or url)
+    path = pathlib.Path(directory).resolve() / f"{slug}.git"
+
+    existed = path.exists()
+    if existed:
+        command = ["git", "--git-dir", str(path), "remote", "update", "--prune"]
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        command = ["git", "clone", "--mirror", "--quiet", url, str(path)]
+
+    try:
+        subprocess.run(
+            command, check=True, capture_output=True, timeout=timeout, env=_git_env()
+        )
+    except subprocess.SubprocessError:
+        # Don't leave a half-cloned mirror behind for the next run to "update"
+        if not existed:
+            shutil.rmtree(path, ignore_errors=True)
+        raise
+
+    return path.as_uri()
+
+
+def scan_repos(
+    repos: dict,
+    max_workers: int,
+    os: str,
+    clone_dir: Optional[str] = None,
+    cache: Optional[Cache] = None,
+    ttl: Optional[int] = None,
+    verified_only: bool = False,
+) -> dict:
     """
     Concurrently loops through a dictionary of provided GitHub repos and scans them with trufflehog.
     Appends the results to the existing dictionary.
-    Takes a dictionary of repos, and a max number of workers/threads to use.
+    Takes a dictionary of repos, a max number of workers/threads to use, and optionally
+    a directory of mirror clones to reuse between runs, a cache for findings, and
+    whether to only report verified secrets.
+    Findings are cached per repo and set of refs, so unchanged repos aren't rescanned.
     Outputs a dict with any potential findings.
     """
+    # Resolve the binary once rather than failing to spawn it for every repo
+    command = find_trufflehog(os)
+    if command is None:
+        print("Error: TruffleHog is not installed, skipping secret scanning.")
+        for repo in repos:
+            repos[repo]["trufflehog_findings"] = {}
+        return repos
+
+    if shutil.which("git") is None:
+        if clone_dir:
+            print(
+                "Error: git is not installed, scanning repos without the clone cache."
+            )
+        clone_dir = None
+        cache = None  # Refs can't be listed, so there's nothing to key findings on
+
+    def scan(url: str) -> Optional[list]:
+        key = None
+        if cache is not None:
+            digest = remote_refs_digest(url)
+            if digest:
+                results = "verified" if verified_only else "verified,unknown"
+                key = f"trufflehog:{results}:{url}:{digest}"
+                findings = cache.get(key)
+                if findings is not None:
+                    return findings
+
+        target = url
+        if clone_dir:
+            try:
+                target = mirror_repo(url, clone_dir)
+            except OSError as e:
+                print(f"Error mirroring {url}, scanning it remotely: {e}")
+            except subprocess.SubprocessError as e:
+                # Unreachable, private, or too slow to clone, so a remote scan would be too
+                print(f"Error mirroring {url}, skipping it: {e}")
+                return None
+
+        findings = scan_repo_with_trufflehog(
+            target, command, concurrency, verified_only
+        )
+        if key and findings is not None:
+            cache.set(key, findings, expire=ttl)
+
+        return findings
+
+    # Mirrors of the same repo (http vs https, ".git", trailing "/") share a single scan
+    mirrors = {}
+    for repo in repos:
+        mirrors.setdefault(canonicalize_repo_url(repo), []).append(repo)
+
+    concurrency = trufflehog_concurrency(min(max_workers, len(mirrors)))
 
     # Using a ThreadPoolExecutor for concurrent execution
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_repo = {
-            executor.submit(scan_repo_with_trufflehog, repo, os): repo for repo in repos
-        }
+        future_to_url = {executor.submit(scan, url): url for url in mirrors}
         for future in tqdm(
-            as_completed(future_to_repo), total=len(repos), desc="Scanning Repos"
+            as_completed(future_to_url), total=len(mirrors), desc="Scanning Repos"
         ):
-            repo = future_to_repo[future]
+            url = future_to_url[future]
             try:
                 findings = future.result()
-                if findings:
-                    repos[repo][
-                        "trufflehog_findings"
-                    ] = findings  # Append results to the existing repo dict
-                else:
-                    repos[repo]["trufflehog_findings"] = {}  # Empty dict if no findings
             except Exception as exc:
-                print(f"Error processing repo {repo}: {exc}")
-                repos[repo][
-                    "trufflehog_findings"
-                ] = {}  # Append empty findings on error
+                print(f"Error processing repo {url}: {exc}")
+                findings = None  # Append empty findings on error
+
+            for repo in mirrors[url]:
+                # Append results to the existing repo dict, empty dict if no findings
+                repos[repo]["trufflehog_findings"] = findings or {}
+
     return repos
 
 
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+def chunk_items(items: Iterable[tuple], size: int) -> Iterator[dict]:
+    """
+    Groups (key, value) pairs into dictionaries of at most `size` items
+    Used to batch several items into a single agent call, works on generators too
+    """
+    items = iter(items)
+    while chunk := dict(itertools.islice(items, size)):
+        yield chunk
+
+
+def truncate_text(text: str, limit: int) -> str:
+    """
+    Trims text to roughly `limit` characters, keeping both the start and the end
+    """
+    if len(text) <= limit:
+        return text
+
+    head = limit * 3 // 4
+    tail = limit - head
+
+    # text[-0:] is the whole text, so a limit too small for a tail just keeps the start
+    if tail <= 0:
+        return text[: max(limit, 0)]
+
+    return f"{text[:head]}\n...\n{text[-tail:]}"
+
+
+def run_concurrently(
+    func: Callable, items: Iterable, max_workers: int, desc: str
+) -> list:
+    """
+    Concurrently calls func on each item, showing a progress bar.
+    Items may come from a generator, each is submitted as soon as it's produced.
+    Returns the results in the same order as the items, None for any call that raised.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_index = {
+            executor.submit(func, item): index for index, item in enumerate(items)
+        }
+        results = [None] * len(future_to_index)
+
+        for future in tqdm(
+            as_completed(future_to_index), total=len(future_to_index), desc=desc
+        ):
+            index = future_to_index[future]
+            try:
+                results[index] = future.result()
+            except Exception as exc:
+                print(f"Error: {desc} failed for item {index}: {exc}")
+
+    return results
+
+
+def _json_default(obj):
+    """
+    Serializes the types orjson doesn't handle natively (datetimes it does)
+    """
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _dump_json(data: dict) -> bytes:
+    """
+    Renders a report as indented UTF-8 JSON
+    """
+    return orjson.dumps(
+        data,
+        default=_json_default,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+def _write_atomic(path: pathlib.Path, data: bytes) -> None:
+    """
+    Writes a file via a synced temp file and a rename, so an interrupted write
+    leaves the previous version intact rather than a truncated one
+    """
+    tmp = path.with_name(f"{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp, path)
 
 
-def save_report(data: dict, filename: str) -> None:
+def save_report(data: dict, filename: str) -> bool:
     """
     Saves a dictionary to a JSON file.
 
     Args:
         data (dict): The dictionary to save.
         filename (str): The path to the JSON file.
+
+    Returns:
+        bool: Whether the report was saved.
     """
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False, cls=CustomJSONEncoder)
+        _write_atomic(pathlib.Path(filename), _dump_json(data))
         print(f"Dictionary saved to {filename}")
+        return True
     except Exception as e:
         print(f"Error saving dictionary to JSON: {e}")
+        return False
+
+
+def load_checkpoint(path: pathlib.Path) -> dict:
+    """
+    Loads the report sections saved by a previous, interrupted run
+    Returns an empty dict if there's no usable checkpoint
+    """
+    try:
+        return orjson.loads(path.read_bytes())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Error loading checkpoint {path}, starting fresh: {e}")
+        return {}
+
+
+def save_checkpoint(report: dict, path: pathlib.Path) -> None:
+    """
+    Saves the report sections completed so far so a failed run can resume
+    A checkpoint that can't be written only costs resumability, so the run carries on
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, _dump_json(report))
+    except (OSError, TypeError, orjson.JSONEncodeError) as e:
+        print(f"Error saving checkpoint {path}, continuing without it: {e}")
+
+
+def canonicalize_repo_url(url: str) -> str:
+    """
+    Normalizes a repository URL so mirrors of the same repo compare equal
+    Forces https, lowercases the host, and strips any ".git" suffix or trailing "/"
+    """
+    parts = urlsplit(url.strip() if "://" in url else f"https://{url.strip()}")
+    path = parts.path.rstrip("/").removesuffix(".git").rstrip("/")
+
+    return f"https://{parts.netloc.lower()}{path}"
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalizes a URL so trivially different spellings of a page compare equal
+    Lowercases the scheme and host, sorts the query, and drops the fragment and trailing "/"
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    return (
+        f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path.rstrip('/')}"
+        + (f"?{query}" if query else "")
+    )
 
 
-def fetch_github_readme(repo_url: str) -> str:
+def dedupe_repos(repos: Iterable[str], limit: int) -> list[str]:
+    """
+    Canonicalizes and deduplicates repository URLs, keeping the first `limit`
+    Returns the unique URLs in the order they were found
+    """
+    unique = dict.fromkeys(canonicalize_repo_url(repo) for repo in repos if repo)
+
+    return list(unique)[:limit]
+
+
+def fetch_github_readme(
+    repo_url: str, cache: Optional[Cache] = None, ttl: Optional[int] = None
+) -> str:
     """
     Fetches the README.md file from a GitHub repository URL.
 
     Args:
         repo_url (str): The URL of the GitHub repository (e.g., 'https://github.com/user/repo').
+        cache (Cache, optional): Stores READMEs with their ETags, so later runs can revalidate them.
+        ttl (int, optional): How long a cached README is kept, in seconds.
 
     Returns:
         str: The content of the README.md file, or a message if the file is not found.
@@ -157,13 +533,25 @@ def fetch_github_readme(repo_url: str) -> str:
 
     owner, repo_name = parts[-2], parts[-1]
 
-    # Construct the raw content URL for the README.md file
-    raw_url = f"https://raw.githubusercontent.com/{owner}/{repo_name}/main/README.md"
+    # Construct the raw content URL for the README.md file on the default branch
+    raw_url = f"https://raw.githubusercontent.com/{owner}/{repo_name}/HEAD/README.md"
+
+    key = f"readme:{raw_url}"
+    cached = cache.get(key) if cache is not None else None
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
 
     try:
-        response = requests.get(raw_url)
+        response = SESSION.get(raw_url, headers=headers, timeout=HTTP_TIMEOUT)
         response.raise_for_status()  # Check if the request was successful
 
+        # Unchanged since the last run, so no body was sent
+        if cached and response.status_code == 304:
+            return cached["text"]
+
+        etag = response.headers.get("ETag")
+        if cache is not None and etag:
+            cache.set(key, {"etag": etag, "text": response.text}, expire=ttl)
+
         # If the request is successful, return the content of the README
         return response.text
     except requests.exceptions.HTTPError as http_err:
@@ -172,37 +560,163 @@ def fetch_github_readme(repo_url: str) -> str:
         return f"An error occurred: {err}"
 
 
-def get_whois_data(domain: str) -> dict:
+def normalize_domains(domains: list[str]) -> set[str]:
     """
-    Takes a single domain and returns the WHOIS data
+    Reduces domains to their registered domain (e.g. example.co.uk for www.blog.example.co.uk)
+    and removes duplicates, since every subdomain shares the registered domain's WHOIS record
+    Drops IP addresses and domains under suffixes that have no WHOIS registry
     """
-    try:
-        whois_data = whois.whois(domain)
-        return (domain, whois_data)
-    except Exception as e:
-        return (domain, "ERROR - MANUALLY VERIFY")
+    normalized = set()
+
+    for domain in domains:
+        if not isinstance(domain, str):
+            continue
+
+        domain = domain.strip().lower().rstrip(".")
+        suffix = domain.rpartition(".")[2]
+        if not suffix or suffix.isdigit() or suffix in NON_WHOIS_SUFFIXES:
+            continue
+
+        registered = tldextract.extract(domain).registered_domain
+        if registered:
+            normalized.add(registered)
+
+    return normalized
+
+
+def build_affiliation_pattern(
+    target: str, domains: list[str], keywords: list[str]
+) -> re.Pattern:
+    """
+    Builds a case-insensitive pattern matching any term that ties text to the target
+    Terms are the target name and keywords (spaced, joined, hyphenated, underscored),
+    the known registered domains, and each one's name (e.g. "example" for www.example.co.uk)
+    Terms only match as whole words, so "hp" doesn't match "php"
+    """
+    terms = set()
+
+    for name in [target, *keywords]:
+        name = name.strip().lower()
+        if name:
+            terms.update(
+                {
+                    name,
+                    name.replace(" ", ""),
+                    name.replace(" ", "-"),
+                    name.replace(" ", "_"),
+                }
+            )
+
+    for domain in normalize_domains(domains):
+        terms.update({domain, tldextract.extract(domain).domain})
+
+    terms.discard("")
+
+    # Longest first, so a term isn't cut short by one of its own prefixes
+    alternation = "|".join(map(re.escape, sorted(terms, key=len, reverse=True)))
+
+    return re.compile(rf"(?<![a-z0-9])(?:{alternation})(?![a-z0-9])", re.IGNORECASE)
+
+
+# rdap.org redirects each lookup to the registry's own RDAP server
+RDAP_URL = "https://rdap.org/domain/{}"
+
+# RDAP event actions -> the python-whois field names the rest of LookerBot expects
+_RDAP_EVENTS = {
+    "registration": "creation_date",
+    "expiration": "expiration_date",
+    "last changed": "updated_date",
+}
+
+
+def fetch_rdap(domain: str) -> dict:
+    """
+    Looks up a domain's registration over RDAP (WHOIS as JSON over HTTPS)
+    Returns the fields the assessments rely on, named like python-whois' output
+    """
+    response = SESSION.get(
+        RDAP_URL.format(domain),
+        headers={"Accept": "application/rdap+json"},
+        timeout=HTTP_TIMEOUT,
+    )
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+
+    record = {
+        "domain_name": data.get("ldhName", domain).lower(),
+        "name_servers": [
+            server["ldhName"].lower()
+            for server in data.get("nameservers", [])
+            if "ldhName" in server
+        ],
+        "status": data.get("status", []),
+    }
+
+    for event in data.get("events", []):
+        field = _RDAP_EVENTS.get(event.get("eventAction"))
+        if field:
+            record[field] = event.get("eventDate")
+
+    # Contacts are jCard arrays of [name, params, type, value] entries
+    for entity in data.get("entities", []):
+        roles = entity.get("roles", [])
+        vcard = entity.get("vcardArray", [None, []])[1]
+        fields = {entry[0]: entry[3] for entry in vcard if len(entry) > 3}
 
+        if "registrar" in roles:
+            record["registrar"] = fields.get("fn")
+        if "registrant" in roles:
+            record["org"] = fields.get("org") or fields.get("fn")
+            record["emails"] = fields.get("email")
 
-def fetch_whois_concurrently(initial_domains: list[str]) -> dict:
+    return record
+
+
+def get_whois_data(domain: str, cache: Cache, ttl: int) -> tuple:
     """
-    Takes a list of domains and concurrently generates a report including WHOIS data
+    Takes a single domain and returns the WHOIS data, falling back to RDAP
+    Records are cached on disk since they rarely change between runs
     """
-    domain_whois_report = {}
+    key = f"whois:{domain}"
+
+    whois_data = cache.get(key)
+    if whois_data is not None:
+        return (domain, whois_data)
+
+    try:
+        whois_data = dict(whois.whois(domain))
+    except Exception:
+        whois_data = None
+
+    # Port 43 servers refuse, throttle, or don't parse for many TLDs, so fall back to RDAP
+    if not whois_data or not whois_data.get("domain_name"):
+        try:
+            whois_data = fetch_rdap(domain)
+        except Exception:
+            return (domain, "ERROR - MANUALLY VERIFY")
+
+    cache.set(key, whois_data, expire=ttl)
+
+    return (domain, whois_data)
+
 
-    with ThreadPoolExecutor(
-        max_workers=3
-    ) as executor:  # Hardcoding this as 3 because we're
-        # Use tqdm to show progress
-        futures = {
-            executor.submit(get_whois_data, domain): domain
+def iter_whois_concurrently(
+    initial_domains: list[str], cache: Cache, ttl: int, max_workers: int = 3
+) -> Iterator[tuple]:
+    """
+    Takes a list of domains and concurrently fetches their WHOIS data
+    Yields (domain, whois_data) pairs as each lookup completes, so callers can start
+    working on early results while the slower registries are still responding
+    """
+    # Kept low by default, WHOIS servers rate limit aggressively
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(get_whois_data, domain, cache, ttl)
             for domain in initial_domains
-        }
+        ]
 
         # Use tqdm for the progress bar
         for future in tqdm(
             as_completed(futures), total=len(futures), desc="Fetching WHOIS data"
         ):
-            domain, whois_data = future.result()
-            domain_whois_report[domain] = whois_data
-
-    return domain_whois_report
+            yield future.result()